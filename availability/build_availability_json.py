@@ -8,17 +8,24 @@ Loads Airbnb/Booking (or any) feed URLs from environment variables defined in
 """
 from __future__ import annotations
 
+import bisect
 import datetime as dt
+import hashlib
+import io
 import json
 import os
 import re
 import sys
-import urllib.request
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import orjson
+import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 try:
     from zoneinfo import ZoneInfo
@@ -28,12 +35,20 @@ except ImportError:  # pragma: no cover
 
 THIS_DIR = Path(__file__).resolve().parent
 OUTPUT_JSON = THIS_DIR / "availability.json"
+CACHE_DIR = THIS_DIR / ".cache"
 
 ENV_PATTERN = re.compile(r"([A-Z0-9_]+)_ICAL_URL_([A-Z0-9_]+)")
 ATHENS_TZ = ZoneInfo("Europe/Athens")
+FETCH_WORKERS = 16
+EPOCH = dt.date(1970, 1, 1)
+
+# Shared keep-alive session so feeds served from the same host reuse connections.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=FETCH_WORKERS))
 
 
 # Convert an ENV-style property name (BLUE_DREAM) into a URL-friendly slug.
+@lru_cache(maxsize=None)
 def slugify(value: str) -> str:
     raw = value.strip().lower()
     if raw == "studio9" or raw == "studio-9":
@@ -41,25 +56,29 @@ def slugify(value: str) -> str:
     return raw.replace("_", "-")
 
 
-# Unfold RFC5545 folded iCal lines into plain lines for easier parsing.
-def unfold_ics(text: str) -> List[str]:
-    out: List[str] = []
-    for line in text.splitlines():
-        if line.startswith((" ", "\t")) and out:
-            out[-1] += line[1:]
+# Unfold RFC5545 folded iCal lines (from a string or a text stream), yielding plain lines.
+def _iter_unfolded(lines: Iterable[str]) -> Iterator[str]:
+    prev: Optional[str] = None
+    for line in lines:
+        # Only the terminator: trailing blanks inside a folded segment are content
+        line = line.rstrip("\r\n")
+        if line.startswith((" ", "\t")) and prev is not None:
+            prev += line[1:]
         else:
-            out.append(line.rstrip("\r"))
-    return out
+            if prev is not None:
+                yield prev.rstrip()  # once per logical line; the parser does no further strip
+            prev = line
+    if prev is not None:
+        yield prev.rstrip()
 
 
-# Parse VEVENT blocks from an ICS string and return a list of (start, end) dates.
-def parse_ics_events(text: str) -> List[Tuple[dt.date, dt.date]]:
-    lines = unfold_ics(text)
-    events: List[Tuple[dt.date, dt.date]] = []
+# Parse VEVENT blocks from iCal lines and yield (start, end) dates as each event closes.
+def parse_ics_events(lines: Iterable[str]) -> Iterator[Tuple[dt.date, dt.date]]:
     current: Dict[str, str] = {}
 
-    for raw in lines:
-        line = raw.strip()
+    for line in _iter_unfolded(lines):
+        if not line:
+            continue
         if line == "BEGIN:VEVENT":
             current = {}
         elif line == "END:VEVENT":
@@ -67,42 +86,67 @@ def parse_ics_events(text: str) -> List[Tuple[dt.date, dt.date]]:
                 start = _extract_date(current, "DTSTART")
                 end = _extract_date(current, "DTEND")
                 if start and end and end > start:
-                    events.append((start, end))
+                    yield start, end
             current = {}
-        elif ":" in line:
-            key, value = line.split(":", 1)
-            current[key] = value
-    return events
+        elif line.startswith(("DTSTART", "DTEND")):
+            # Only the date bounds matter; skip SUMMARY/UID/DESCRIPTION etc.
+            key, _, value = line.partition(":")
+            if value:
+                # Drop parameters (DTSTART;VALUE=DATE -> DTSTART) so lookups are O(1).
+                current[key.partition(";")[0]] = value
 
 
-# Extract a DTSTART/DTEND value from the raw event dictionary and normalize to Athens.
+# Look up a DTSTART/DTEND value (keys stored without parameters) and normalize to Athens.
 def _extract_date(event: Dict[str, str], key: str) -> Optional[dt.date]:
-    for stored_key, value in event.items():
-        if stored_key.split(";", 1)[0] == key:
-            return parse_to_athens_date(value)
-    return None
+    value = event.get(key)
+    return parse_to_athens_date(value) if value else None
+
+
+# Convert ICS date strings into a local (Athens) date object (memoized: boundaries repeat a lot).
+# Split a strict YYYYMMDDTHHMMSS stamp into int fields; None for any other shape.
+def _stamp_fields(stamp: str) -> Optional[Tuple[int, ...]]:
+    if len(stamp) != 15 or stamp[8] != "T" or not stamp.isascii():
+        return None
+    if not (stamp[:8].isdigit() and stamp[9:].isdigit()):
+        return None
+    return (
+        int(stamp[0:4]),
+        int(stamp[4:6]),
+        int(stamp[6:8]),
+        int(stamp[9:11]),
+        int(stamp[11:13]),
+        int(stamp[13:15]),
+    )
 
 
-# Convert ICS date strings into a local (Athens) date object.
+@lru_cache(maxsize=4096)
 def parse_to_athens_date(value: str) -> Optional[dt.date]:
     value = value.strip()
     if not value:
         return None
 
     if len(value) == 8 and value.isdigit():
-        # YYYYMMDD (date-only)
-        return dt.datetime.strptime(value, "%Y%m%d").date()
+        # YYYYMMDD (date-only); slice ints directly, strptime is slow per event
+        return dt.date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
 
+    # Exact-shape stamps are sliced; anything else keeps strptime's acceptance and errors.
     if value.endswith("Z"):
-        aware = dt.datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(
-            tzinfo=dt.timezone.utc
-        )
+        fields = _stamp_fields(value[:-1])
+        if fields is None:
+            aware = dt.datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(
+                tzinfo=dt.timezone.utc
+            )
+        else:
+            aware = dt.datetime(*fields, tzinfo=dt.timezone.utc)
         return aware.astimezone(ATHENS_TZ).date()
 
     if "T" in value and len(value) >= 15:
-        naive = dt.datetime.strptime(value, "%Y%m%dT%H%M%S")
-        aware = naive.replace(tzinfo=ATHENS_TZ)
-        return aware.date()
+        fields = _stamp_fields(value)
+        if fields is None:
+            naive = dt.datetime.strptime(value, "%Y%m%dT%H%M%S")
+        else:
+            naive = dt.datetime(*fields)
+        return naive.replace(tzinfo=ATHENS_TZ).date()
 
     try:
         parsed = dt.datetime.fromisoformat(value)
@@ -117,7 +161,8 @@ def parse_to_athens_date(value: str) -> Optional[dt.date]:
 def discover_feeds() -> Dict[str, List[str]]:
     feeds: Dict[str, List[str]] = defaultdict(list)
     for key, url in os.environ.items():
-        if not url:
+        # Cheap substring test first so PATH, HOME, etc. never reach the regex.
+        if "_ICAL_URL_" not in key or not url:
             continue
         match = ENV_PATTERN.fullmatch(key)
         if not match:
@@ -128,21 +173,93 @@ def discover_feeds() -> Dict[str, List[str]]:
     return feeds
 
 
-# Fetch an ICS feed and return its textual contents (UTF-8).
-def fetch_ics(url: str) -> str:
-    with urllib.request.urlopen(url) as response:
-        return response.read().decode("utf-8", errors="ignore")
+# Locations of the on-disk cache entry (validators JSON + raw body) for a feed URL.
+def _cache_paths(url: str) -> Tuple[Path, Path]:
+    base = CACHE_DIR / hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return base.with_suffix(".json"), base.with_suffix(".ics")
+
+
+# Load the cached {etag, last_modified} validators for a feed, if its body is cached too.
+def _load_cached_validators(url: str) -> Optional[Dict[str, str]]:
+    meta_path, body_path = _cache_paths(url)
+    if not body_path.exists():
+        return None
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+# Pass lines through unchanged while copying them into the cache file being written.
+def _tee_lines(lines: Iterable[str], write: Callable[[str], int]) -> Iterator[str]:
+    for line in lines:
+        write(line)
+        yield line
+
+
+# Parse a streamed feed while teeing it to disk, then publish body + validators to the cache.
+def _parse_and_cache(
+    url: str, lines: Iterable[str], validators: Dict[str, str]
+) -> List[Tuple[dt.date, dt.date]]:
+    meta_path, body_path = _cache_paths(url)
+    tmp = body_path.with_suffix(".ics.tmp")
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        sink = open(tmp, "w", encoding="utf-8")
+    except OSError as exc:
+        print(f"[WARN] Could not cache feed {url}: {exc}", file=sys.stderr)
+        return list(parse_ics_events(lines))
+
+    with sink:
+        events = list(parse_ics_events(_tee_lines(lines, sink.write)))
+    try:
+        os.replace(tmp, body_path)
+        meta_path.write_text(json.dumps(validators), encoding="utf-8")
+    except OSError as exc:
+        print(f"[WARN] Could not cache feed {url}: {exc}", file=sys.stderr)
+    return events
+
+
+# Fetch an ICS feed and parse it line by line (UTF-8), revalidating any cached copy.
+# The body is streamed, never held in memory as one string.
+def fetch_events(url: str) -> List[Tuple[dt.date, dt.date]]:
+    cached = _load_cached_validators(url)
+    headers: Dict[str, str] = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    with _SESSION.get(url, headers=headers, timeout=10, stream=True) as response:
+        if response.status_code == 304 and cached:
+            _meta_path, body_path = _cache_paths(url)
+            with open(body_path, encoding="utf-8", errors="ignore") as body:
+                return list(parse_ics_events(body))
+        response.raise_for_status()
+
+        response.raw.decode_content = True  # let urllib3 undo gzip/deflate
+        response.raw.auto_close = False  # TextIOWrapper must see EOF, not a closed file
+        lines = io.TextIOWrapper(response.raw, encoding="utf-8", errors="ignore")
+        validators = {
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+        }
+        if not any(validators.values()):
+            return list(parse_ics_events(lines))
+        return _parse_and_cache(url, lines, validators)
 
 
 # Merge overlapping date ranges while preserving half-open semantics.
 def merge_ranges(ranges: Iterable[Tuple[dt.date, dt.date]]) -> List[Tuple[dt.date, dt.date]]:
-    ordered = sorted(ranges, key=lambda pair: pair[0])
+    ordered = sorted(ranges)  # tuples already order by start; no per-item lambda
     if not ordered:
         return []
     merged: List[Tuple[dt.date, dt.date]] = []
-    cur_start, cur_end = ordered[0]
+    remaining = iter(ordered)  # walk in place instead of copying ordered[1:]
+    cur_start, cur_end = next(remaining)
 
-    for start, end in ordered[1:]:
+    for start, end in remaining:
         if start < cur_end:  # overlapping (half-open, so equal end/start stays separate)
             if end > cur_end:
                 cur_end = end
@@ -153,32 +270,61 @@ def merge_ranges(ranges: Iterable[Tuple[dt.date, dt.date]]) -> List[Tuple[dt.dat
     return merged
 
 
-# Build the final availability mapping by fetching each feed and merging ranges.
-def build_availability(feeds: Dict[str, List[str]]) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
-    availability: Dict[str, Dict[str, List[Dict[str, str]]]] = {}
-    cutoff_date = dt.datetime.now(ATHENS_TZ).date() + dt.timedelta(days=150)
+# Drop far-future bookings so the JSON stays focused on the next ~5 months, and bound the
+# rest at the cutoff. Sorting lets one bisect find the boundary instead of a test per event.
+def clip_to_cutoff(
+    ranges: Iterable[Tuple[dt.date, dt.date]], cutoff_date: dt.date
+) -> List[Tuple[dt.date, dt.date]]:
+    ordered = sorted(ranges)
+    kept = ordered[: bisect.bisect_left(ordered, (cutoff_date,))]
+    # Every kept start is before the cutoff and parsed events have end > start,
+    # so the bounded range is never empty.
+    return [(start, min(end, cutoff_date)) for start, end in kept]
+
+
+# Encode merged (non-overlapping, sorted) ranges as parallel epoch-day arrays so consumers
+# can answer "is day D booked?" with a binary search instead of scanning the list.
+def build_range_index(merged: List[Tuple[dt.date, dt.date]]) -> Dict[str, List[int]]:
+    return {
+        "starts": [(start - EPOCH).days for start, _ in merged],
+        "ends": [(end - EPOCH).days for _, end in merged],
+    }
+
 
+# Build the final availability mapping by fetching each feed and merging ranges.
+def build_availability(feeds: Dict[str, List[str]], now: dt.datetime) -> Dict[str, Dict[str, object]]:
+    availability: Dict[str, Dict[str, object]] = {}
+    cutoff_date = now.astimezone(ATHENS_TZ).date() + dt.timedelta(days=150)
+    ranges_by_slug: Dict[str, List[Tuple[dt.date, dt.date]]] = defaultdict(list)
+    # Fetch each distinct URL once, then fan its events out to every slug that lists it.
+    slugs_by_url: Dict[str, List[str]] = defaultdict(list)
     for slug, urls in feeds.items():
-        all_ranges: List[Tuple[dt.date, dt.date]] = []
         for url in urls:
-            try:
-                ics_text = fetch_ics(url)
-                ranges = parse_ics_events(ics_text)
-                for start, end in ranges:
-                    if start >= cutoff_date:
-                        # Drop far-future bookings so the JSON stays focused on the next ~5 months.
-                        continue
-                    bounded_end = min(end, cutoff_date)
-                    if bounded_end > start:
-                        all_ranges.append((start, bounded_end))
-            except Exception as exc:  # pragma: no cover - network issues
-                print(f"[WARN] Failed to ingest {slug} feed {url}: {exc}", file=sys.stderr)
-
-        merged = merge_ranges(all_ranges)
+            if slug not in slugs_by_url[url]:
+                slugs_by_url[url].append(slug)
+
+    if slugs_by_url:
+        # Feeds are network-bound, so fetch them concurrently and parse as they arrive.
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(slugs_by_url))) as executor:
+            futures = {executor.submit(fetch_events, url): url for url in slugs_by_url}
+            for future in as_completed(futures):
+                url = futures[future]
+                slugs = slugs_by_url[url]
+                try:
+                    clipped = clip_to_cutoff(future.result(), cutoff_date)
+                except Exception as exc:  # pragma: no cover - network issues
+                    label = ", ".join(slugs)
+                    print(f"[WARN] Failed to ingest {label} feed {url}: {exc}", file=sys.stderr)
+                    continue
+                for slug in slugs:
+                    ranges_by_slug[slug].extend(clipped)
+
+    for slug in feeds:
+        merged = merge_ranges(ranges_by_slug[slug])
+        # orjson serializes date objects as YYYY-MM-DD, so keep them as-is here.
         availability[slug] = {
-            "booked": [
-                {"start": start.isoformat(), "end": end.isoformat()} for start, end in merged
-            ]
+            "booked": [{"start": start, "end": end} for start, end in merged],
+            "index": build_range_index(merged),
         }
 
     return availability
@@ -191,13 +337,18 @@ def main() -> None:
     if not feeds:
         print("[WARN] No iCal feeds discovered. Availability JSON will contain empty data.")
 
-    availability = build_availability(feeds)
+    # One clock read drives both the booking cutoff and the "updated" stamp.
+    now = dt.datetime.now(dt.timezone.utc)
+    availability = build_availability(feeds, now)
     payload = {
-        "updated": dt.datetime.now(dt.timezone.utc).isoformat().replace("+00:00", "Z"),
+        "updated": now.isoformat().replace("+00:00", "Z"),
         "properties": availability,
     }
 
-    OUTPUT_JSON.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    # Write to a sibling temp file and swap it in so readers never see a partial file.
+    tmp = OUTPUT_JSON.with_suffix(".json.tmp")
+    tmp.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, OUTPUT_JSON)
     print(f"[OK] Wrote availability JSON to {OUTPUT_JSON}")
 
 
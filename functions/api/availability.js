@@ -44,6 +44,12 @@ export async function onRequest({ request, env }) {
     return jsonResponse({ ok: false, error: "parse_error" }, 500);
   }
 
+  // Optional server-side window: only return ranges starting before `until` (YYYY-MM-DD)
+  const until = url.searchParams.get("until");
+  if (until && /^\d{4}-\d{2}-\d{2}$/.test(until) && Array.isArray(booked)) {
+    booked = booked.filter((range) => range && range.start < until);
+  }
+
   const responseBody = { ok: true, slug, key, booked };
 
   // Include last_sync timestamp if available (ISO string)
@@ -51,10 +57,33 @@ export async function onRequest({ request, env }) {
     responseBody.last_sync = lastSyncRaw;
   }
 
-  return jsonResponse(responseBody, 200, {
+  // ETag lets repeat pollers revalidate with If-None-Match and get a bodiless 304
+  const cacheHeaders = {
     "Cache-Control": "public, max-age=60",
     Vary: "Accept-Encoding",
-  });
+    ETag: await computeETag(JSON.stringify(responseBody)),
+  };
+  if (etagMatches(request.headers.get("If-None-Match"), cacheHeaders.ETag)) {
+    return new Response(null, { status: 304, headers: cacheHeaders });
+  }
+
+  return jsonResponse(responseBody, 200, cacheHeaders);
+}
+
+async function computeETag(text) {
+  const digest = await crypto.subtle.digest("SHA-1", new TextEncoder().encode(text));
+  const hex = [...new Uint8Array(digest)]
+    .map((b) => b.toString(16).padStart(2, "0"))
+    .join("");
+  return `"${hex}"`;
+}
+
+// Compare ignoring weak prefixes (Cloudflare weakens ETags when it compresses).
+function etagMatches(header, etag) {
+  if (!header) return false;
+  const strip = (tag) => tag.trim().replace(/^W\//, "");
+  const target = strip(etag);
+  return header.split(",").some((tag) => tag.trim() === "*" || strip(tag) === target);
 }
 
 function normalizeSlug(value) {